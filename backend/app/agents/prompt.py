@@ -1,3 +1,44 @@
+# ============ 查询模板 ============
+# 模板字符串在Agent模块导入时编译为PromptTemplate,占位符只解析一次
+
+ATTRACTION_QUERY_TEMPLATE = """请使用amap_maps_text_search工具搜索{city}的{keywords}相关景点。
+[TOOL_CALL:amap_maps_text_search:keywords={keywords},city={city}]"""
+
+WEATHER_QUERY_TEMPLATE = "请查询{city}未来{travel_days}天的天气情况。"
+
+HOTEL_QUERY_TEMPLATE = "请推荐{city}合适的{accommodation},并给出地址和位置信息。"
+
+PLANNER_SYNTH_QUERY_TEMPLATE = """请根据以下三位专家收集的信息，规划出{travel_days}天的旅行计划，
+        每天安排2-3个景点、早中晚三餐及推荐酒店，输出完整JSON格式结果。
+
+        **景点搜索专家的结果:**
+        {attractions}
+
+        **天气查询专家的结果:**
+        {weather}
+
+        **酒店推荐专家的结果:**
+        {hotels}
+
+        **基本信息:**
+        - 城市: {city}
+        - 日期: {start_date} 至 {end_date}
+        - 天数: {travel_days}天
+        - 交通方式: {transportation}
+        - 住宿: {accommodation}
+        - 偏好: {preferences}
+
+
+        **要求:**
+        1. 每天安排2-3个景点
+        2. 每天必须包含早中晚三餐
+        3. 每天推荐一个具体的酒店(从酒店信息中选择)
+        3. 考虑景点之间的距离和交通方式
+        4. 返回完整的JSON格式数据
+        5. 景点的经纬度坐标要真实准确
+        """
+
+
 # ============ Agent提示词 ============
 
 ATTRACTION_AGENT_PROMPT = """你是景点搜索专家。你的任务是根据城市和用户偏好搜索合适的景点。
@@ -62,17 +103,12 @@ HOTEL_AGENT_PROMPT = """你是酒店推荐专家。你的任务是根据城市
 3. 关键词使用"酒店"或"宾馆"
 """
 
-PLANNER_AGENT_PROMPT = """你是旅行规划的总指挥。
-当用户请求旅行计划时，请依次执行以下步骤：
-1. 指示“attraction_expert”执行景点搜索。
-2. 指示“weather_expert”查询天气。
-3. 指示“hotel_expert”推荐酒店。
-4. 收集所有返回信息，生成最终行程计划。
-
-请在每一步结束后总结结果并传递给下一个子Agent。
+PLANNER_AGENT_PROMPT = """你是旅行规划的总规划师。
+景点、天气、酒店三位专家已经分别完成了信息收集，你会在用户消息中收到它们的结果。
+你的任务是综合这些信息，生成最终行程计划。
 
 **注意事项:**
-- 调用各子Agent时必须使用工具，不要自己编造数据
+- 只使用专家提供的信息，不要自己编造数据
 - JSON格式必须严格遵循，包括每天景点、餐饮、住宿、天气和预算信息
 - 提供实用旅行建议，考虑景点之间距离和游览时间
 - 景点、酒店位置坐标必须真实准确
@@ -1,17 +1,132 @@
 """多智能体旅行规划系统"""
 
-from .prompt import ATTRACTION_AGENT_PROMPT,PLANNER_AGENT_PROMPT,HOTEL_AGENT_PROMPT,WEATHER_AGENT_PROMPT
+from .prompt import (
+    ATTRACTION_AGENT_PROMPT,
+    PLANNER_AGENT_PROMPT,
+    HOTEL_AGENT_PROMPT,
+    WEATHER_AGENT_PROMPT,
+    ATTRACTION_QUERY_TEMPLATE,
+    WEATHER_QUERY_TEMPLATE,
+    HOTEL_QUERY_TEMPLATE,
+    PLANNER_SYNTH_QUERY_TEMPLATE,
+)
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any, List, TypedDict
+import logging
+import operator
+import orjson
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, List, TypedDict
+from cachetools import TTLCache
+from ..logging_utils import get_logger
+from ..utils import extract_json_object
 from ..services.llm_service import get_llm
 from ..services.amap_service import get_amap_service
 from ..models.schemas import TripRequest, TripPlan, DayPlan, Attraction, Meal, WeatherInfo, Location, Hotel
 from ..config import get_settings
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
-from langgraph_supervisor import create_supervisor
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.prompts import PromptTemplate
+
+logger = get_logger(__name__)
+
+# 导入时取出pydantic-core编译好的校验器,热路径上直接validate_python
+# 跳过TripPlan(**data)的Python层构造开销
+_TRIPPLAN_VALIDATOR = TripPlan.__pydantic_validator__
+
+# 规划结果缓存: 进程内全局共享(池内多个实例命中同一份缓存)
+_shared_plan_cache = TTLCache(maxsize=128, ttl=1800)
+
+# 流式循环的常量: 汇总节点名与取末尾消息的预绑定getter
+_SYNTH_NODE = "planner_synth"
+_LAST_MESSAGE = operator.itemgetter(-1)
+
+# 备用计划的三餐模板(type, 名称后缀, 描述),只有天数编号逐天变化
+_FALLBACK_MEALS = (
+    ("breakfast", "早餐", "当地特色早餐"),
+    ("lunch", "午餐", "午餐推荐"),
+    ("dinner", "晚餐", "晚餐推荐"),
+)
+
+# 导入时预编译查询模板,占位符解析只做一次,每次请求只做format
+_ATTRACTION_QUERY = PromptTemplate.from_template(ATTRACTION_QUERY_TEMPLATE)
+_WEATHER_QUERY = PromptTemplate.from_template(WEATHER_QUERY_TEMPLATE)
+_HOTEL_QUERY = PromptTemplate.from_template(HOTEL_QUERY_TEMPLATE)
+_PLANNER_SYNTH_QUERY = PromptTemplate.from_template(PLANNER_SYNTH_QUERY_TEMPLATE)
+
+
+async def _batched(stream: AsyncIterator[Any], max_chunks: int = 16, max_ms: int = 50) -> AsyncIterator[List[Any]]:
+    """
+    将异步流按条数/时间窗口攒批
+
+    攒满max_chunks条或距本批第一条超过max_ms毫秒时产出一批,
+    摊薄逐chunk的Python层开销;时间窗口到期时在途的取数任务
+    继续挂起,不会丢块
+
+    Args:
+        stream: 上游异步迭代器
+        max_chunks: 单批最大条数
+        max_ms: 单批最长等待时间(毫秒)
+
+    Yields:
+        chunk列表
+    """
+    loop = asyncio.get_running_loop()
+    it = stream.__aiter__()
+    batch: List[Any] = []
+    next_task = None
+    deadline = None
+
+    try:
+        while True:
+            if next_task is None:
+                next_task = asyncio.ensure_future(it.__anext__())
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({next_task}, timeout=timeout)
+
+            if not done:
+                # 时间窗口到期: 先吐出已有批次,取数任务继续等
+                if batch:
+                    yield batch
+                    batch = []
+                deadline = None
+                continue
+
+            try:
+                item = next_task.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                next_task = None
+
+            if not batch:
+                deadline = loop.time() + max_ms / 1000.0
+            batch.append(item)
+
+            if len(batch) >= max_chunks:
+                yield batch
+                batch = []
+                deadline = None
+
+        if batch:
+            yield batch
+    finally:
+        # 消费方提前关闭(如SSE断连抛GeneratorExit)时,
+        # 回收在途取数任务并关闭上游流,不留悬挂任务
+        if next_task is not None and not next_task.done():
+            next_task.cancel()
+            try:
+                await next_task
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+        aclose = getattr(it, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
 
 class MultiAgentTripPlanner:
     """基于LangGraph的多智能体旅行规划系统"""
@@ -36,6 +151,8 @@ class MultiAgentTripPlanner:
             self.weather_agent =None
             self.hotel_agent =None
             self.planner_agent =None
+            # 规划结果缓存: 池内所有实例共享,相同请求30分钟内直接复用
+            self._plan_cache = _shared_plan_cache
         except Exception as e:
             print(f"❌ 多智能体系统初始化失败: {str(e)}")
             raise
@@ -43,42 +160,65 @@ class MultiAgentTripPlanner:
     async def init(self):
         """异步初始化方法"""
         try:
-            # 创建共享的MCP工具(只创建一次)
-            print("  - 创建共享MCP工具...")
-            self.amap_service = await get_amap_service()
+            # 创建共享MCP工具和LLM客户端(互相独立,并发预热)
+            print("  - 并发创建共享MCP工具和LLM客户端...")
+            self.amap_service, self.llm = await asyncio.gather(
+                get_amap_service(),
+                asyncio.to_thread(get_llm),
+            )
             self.amap_tool = self.amap_service.mcp_tool
             self.settings = get_settings()
-            self.llm = get_llm()
 
 
-            # 实例化子Agent
+            # 按职责切分工具: 每个专家只携带自己会用到的工具schema,
+            # 减少每轮对话注入的prompt token
+            attraction_tools = [
+                t for t in self.amap_tool
+                if t.name in {"maps_text_search", "maps_search_detail"}
+            ]
+            weather_tools = [t for t in self.amap_tool if t.name == "maps_weather"]
+            hotel_tools = [
+                t for t in self.amap_tool
+                if t.name in {"maps_text_search", "maps_geo"}
+            ]
+
+            # 实例化子Agent(纯Python构造,无IO,无需并行)
             self.attraction_agent = create_react_agent(
                 model=self.llm,
-                tools=self.amap_tool,
+                tools=attraction_tools,
                 prompt=ATTRACTION_AGENT_PROMPT,
                 name="attraction_expert",
             )
             self.weather_agent = create_react_agent(
                 model=self.llm,
-                tools=self.amap_tool,
+                tools=weather_tools,
                 prompt=WEATHER_AGENT_PROMPT,
                 name="weather_expert",
             )
             self.hotel_agent = create_react_agent(
                 model=self.llm,
-                tools=self.amap_tool,
+                tools=hotel_tools,
                 prompt=HOTEL_AGENT_PROMPT,
                 name="hotel_expert",
             )
-            self.planner_agent = create_supervisor(
-                agents=[self.attraction_agent,self.weather_agent, self.hotel_agent],
-                model=self.llm,
-                prompt=PLANNER_AGENT_PROMPT,
-                name="planner_supervisor",
-                output_mode="last_message"
-            )
 
-            self.planner_agent = self.planner_agent.compile()
+            # 构建并行协作图: 三个专家节点互相独立,并发执行后汇总
+            # START -> {attraction, weather, hotel} -> planner_synth -> END
+            graph = StateGraph(self.TripPlannerState)
+            graph.add_node("attraction_node", self._attraction_node)
+            graph.add_node("weather_node", self._weather_node)
+            graph.add_node("hotel_node", self._hotel_node)
+            graph.add_node("planner_synth", self._planner_synth_node)
+
+            graph.add_edge(START, "attraction_node")
+            graph.add_edge(START, "weather_node")
+            graph.add_edge(START, "hotel_node")
+            graph.add_edge("attraction_node", "planner_synth")
+            graph.add_edge("weather_node", "planner_synth")
+            graph.add_edge("hotel_node", "planner_synth")
+            graph.add_edge("planner_synth", END)
+
+            self.planner_agent = graph.compile()
             print("✅ 多智能体系统初始化完成")
 
         except Exception as e:
@@ -103,10 +243,22 @@ class MultiAgentTripPlanner:
             print(f"天数: {request.travel_days}天")
             print(f"偏好: {', '.join(request.preferences) if request.preferences else '无'}")
             print(f"{'='*60}\n")
-            
-            
-            trip_plan = await self._build_planner_query(request)
-            final_plan = self._parse_response(trip_plan,request)
+
+
+            cache_key = self._request_cache_key(request)
+            trip_plan = self._plan_cache.get(cache_key)
+            if trip_plan is not None:
+                print("⚡ 命中规划缓存,跳过多智能体协作\n")
+                final_plan = self._parse_response(trip_plan, request)
+            else:
+                trip_plan = await self._build_planner_query(request)
+                final_plan = self._try_parse_response(trip_plan)
+                if final_plan is not None:
+                    # 解析通过才进缓存,垃圾输出不会被钉住30分钟
+                    self._plan_cache[cache_key] = trip_plan
+                else:
+                    print(f"   将使用备用方案生成计划")
+                    final_plan = self._create_fallback_plan(request)
             
             print(f"{'='*60}")
             print(f"✅ 旅行计划生成完成!")
@@ -120,9 +272,14 @@ class MultiAgentTripPlanner:
             traceback.print_exc()
             return self._create_fallback_plan(request)
     
+    @staticmethod
+    def _request_cache_key(request: TripRequest) -> str:
+        """计算请求的规范化缓存键(城市/日期/偏好等全部字段参与)"""
+        payload = json.dumps(request.model_dump(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def _build_attraction_query(self, request: TripRequest) -> str:
         """构建景点搜索查询 - 直接包含工具调用"""
-        keywords = []
         if request.preferences:
             # 只取第一个偏好作为关键词
             keywords = request.preferences[0]
@@ -130,49 +287,89 @@ class MultiAgentTripPlanner:
             keywords = "景点"
 
         # 直接返回工具调用格式
-        query = f"请使用amap_maps_text_search工具搜索{request.city}的{keywords}相关景点。\n[TOOL_CALL:amap_maps_text_search:keywords={keywords},city={request.city}]"
+        return _ATTRACTION_QUERY.format(keywords=keywords, city=request.city)
+
+    async def _attraction_node(self, state: "TripPlannerState") -> Dict[str, Any]:
+        """景点搜索节点: 调用景点专家Agent"""
+        request = state["request"]
+        query = self._build_attraction_query(request)
+
+        result = await self.attraction_agent.ainvoke(
+            {"messages": [HumanMessage(content=query)]}
+        )
+        content = _LAST_MESSAGE(result["messages"]).content
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[attraction_expert] %s", content[:400])
+        return {"attractions": content}
+
+    async def _weather_node(self, state: "TripPlannerState") -> Dict[str, Any]:
+        """天气查询节点: 调用天气专家Agent"""
+        request = state["request"]
+        query = _WEATHER_QUERY.format(city=request.city, travel_days=request.travel_days)
+
+        result = await self.weather_agent.ainvoke(
+            {"messages": [HumanMessage(content=query)]}
+        )
+        content = _LAST_MESSAGE(result["messages"]).content
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[weather_expert] %s", content[:400])
+        return {"weather": content}
+
+    async def _hotel_node(self, state: "TripPlannerState") -> Dict[str, Any]:
+        """酒店推荐节点: 调用酒店专家Agent"""
+        request = state["request"]
+        query = _HOTEL_QUERY.format(city=request.city, accommodation=request.accommodation)
+
+        result = await self.hotel_agent.ainvoke(
+            {"messages": [HumanMessage(content=query)]}
+        )
+        content = _LAST_MESSAGE(result["messages"]).content
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[hotel_expert] %s", content[:400])
+        return {"hotels": content}
+
+    async def _planner_synth_node(self, state: "TripPlannerState") -> Dict[str, Any]:
+        """汇总节点: 基于三个专家的结果合成最终JSON计划,不再调用工具"""
+        request = state["request"]
+        query = self._build_synth_query(request, state)
+
+        response = await self.llm.ainvoke([
+            SystemMessage(content=PLANNER_AGENT_PROMPT),
+            HumanMessage(content=query),
+        ])
+        content = response.content
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[planner_synth] %s", content[:400])
+        return {"plan": content}
+
+    def _build_synth_query(self, request: TripRequest, state: "TripPlannerState") -> str:
+        """构建汇总查询: 将三个专家的输出与用户需求填入预编译模板"""
+        query = _PLANNER_SYNTH_QUERY.format(
+            attractions=state.get("attractions", "无"),
+            weather=state.get("weather", "无"),
+            hotels=state.get("hotels", "无"),
+            city=request.city,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            travel_days=request.travel_days,
+            transportation=request.transportation,
+            accommodation=request.accommodation,
+            preferences=', '.join(request.preferences) if request.preferences else '无',
+        )
+        if request.free_text_input:
+            query += f"\n**额外要求:** {request.free_text_input}"
+
         return query
 
-    async def _build_planner_query(self, request: TripRequest) -> str:
+    async def _stream_planner_query(self, request: TripRequest) -> AsyncIterator[str]:
         """
-        使用 supervisor 多智能体系统自动生成旅行计划
+        流式运行并行多智能体图,逐token产出最终计划
+
+        三个专家节点并发执行,planner_synth汇总;只有汇总节点的
+        token会向外转发,调用方可以边收边推送(SSE)而不必等整图跑完
         """
         if self.planner_agent is None:
                 raise RuntimeError("请先运行 await init() 初始化")
-        
-        attraction_query = self._build_attraction_query(request)
-
-        query = f"""你是一个旅行规划协调专家，你可以指挥三个子智能体：
-        - 景点搜索专家：负责根据城市与偏好搜索景点。
-        - 天气查询专家：负责查询该城市的天气。
-        - 酒店推荐专家：负责推荐合适酒店。
-
-        请协调它们完成以下任务：
-        1. {attraction_query}；
-        2. 查询当地未来{request.travel_days}天的天气；
-        3. 推荐合适的{request.accommodation}酒店；
-        4. 综合所有结果，规划出{request.travel_days}天的旅行计划，每天安排2-3个景点、早中晚三餐及推荐酒店；
-        5. 输出完整 JSON 格式结果（含景点坐标、时间安排、住宿和交通建议）。
-
-        **基本信息:**
-        - 城市: {request.city}
-        - 日期: {request.start_date} 至 {request.end_date}
-        - 天数: {request.travel_days}天
-        - 交通方式: {request.transportation}
-        - 住宿: {request.accommodation}
-        - 偏好: {', '.join(request.preferences) if request.preferences else '无'}
-
-
-        **要求:**
-        1. 每天安排2-3个景点
-        2. 每天必须包含早中晚三餐
-        3. 每天推荐一个具体的酒店(从酒店信息中选择)
-        3. 考虑景点之间的距离和交通方式
-        4. 返回完整的JSON格式数据
-        5. 景点的经纬度坐标要真实准确
-        """
-        if request.free_text_input:
-            query += f"\n**额外要求:** {request.free_text_input}"
 
         config = {
                 "configurable": {
@@ -181,77 +378,107 @@ class MultiAgentTripPlanner:
                 }
         }
         print("\n📋 启动多智能体协作生成旅行计划...\n")
-        # 🧠 用于存储最终planner输出
-        final_output = None
-        async for chunk in self.planner_agent.astream(
-                {"messages": [HumanMessage(content=query)]},
-                stream_mode=["values"],# 
-                config=config
-        ):
-                    if "messages" in chunk[1]:
-                        message = chunk[1]["messages"][-1]
-                        role = message.__class__.__name__
-                        content = message.content
-                        print(f"[{role}] {content[:]}...\n")  # 打印前400字符，避免过长
-                        final_output = content  # 🔥 保留最后一次AI输出
-
-        return final_output
+        stream = self.planner_agent.astream(
+            {"request": request, "messages": []},
+            stream_mode="messages",
+            config=config
+        )
+        # 攒批消费,避免逐token的Python帧开销;常量在循环外绑定
+        synth_node = _SYNTH_NODE
+        async for batch in _batched(stream):
+            # 专家节点的中间输出不往外推,只转发汇总节点的token
+            parts = [
+                message.content
+                for message, metadata in batch
+                if metadata.get("langgraph_node") == synth_node and message.content
+            ]
+            if parts:
+                yield "".join(parts)
+
+    async def plan_trip_stream(self, request: TripRequest) -> AsyncIterator[str]:
+        """
+        流式生成旅行计划,逐块产出原始token
+
+        完整输出会写入规划缓存,供plan_trip与重复请求复用
+        """
+        cache_key = self._request_cache_key(request)
+        cached = self._plan_cache.get(cache_key)
+        if cached is not None:
+            print("⚡ 命中规划缓存,直接返回完整计划\n")
+            yield cached
+            return
+
+        chunks: List[str] = []
+        async for chunk in self._stream_planner_query(request):
+            chunks.append(chunk)
+            yield chunk
+
+        # 空流或解析不过的累积结果不进缓存,避免坏输出被复用
+        full_output = "".join(chunks)
+        if full_output and self._try_parse_response(full_output) is not None:
+            self._plan_cache[cache_key] = full_output
+
+    async def _build_planner_query(self, request: TripRequest) -> str:
+        """非流式兼容封装: 聚合流式输出为完整计划文本"""
+        chunks = [chunk async for chunk in self._stream_planner_query(request)]
+        return "".join(chunks)
     
-    def _parse_response(self, response: str, request: TripRequest) -> TripPlan:
+    def _try_parse_response(self, response: str):
         """
-        解析Agent响应
-        
+        解析Agent响应,失败时返回None
+
         Args:
             response: Agent响应文本
-            request: 原始请求
-            
+
         Returns:
-            旅行计划
+            旅行计划,解析失败时为None
         """
         try:
             # 尝试从响应中提取JSON
-            # 查找JSON代码块
-            if "```json" in response:
-                json_start = response.find("```json") + 7
-                json_end = response.find("```", json_start)
-                json_str = response[json_start:json_end].strip()
-            elif "```" in response:
-                json_start = response.find("```") + 3
-                json_end = response.find("```", json_start)
-                json_str = response[json_start:json_end].strip()
-            elif "{" in response and "}" in response:
-                # 直接查找JSON对象
-                json_start = response.find("{")
-                json_end = response.rfind("}") + 1
-                json_str = response[json_start:json_end]
-            else:
+            # 单次扫描定位最外层JSON对象: ```json围栏内的对象、
+            # 裸对象、缺失闭合围栏的对象都走同一条路径
+            json_str = extract_json_object(response)
+            if json_str is None:
                 raise ValueError("响应中未找到JSON数据")
-            
+
             # 解析JSON
-            data = json.loads(json_str)
-            
-            # 转换为TripPlan对象
-            trip_plan = TripPlan(**data)
-            
-            return trip_plan
-            
+            data = orjson.loads(json_str)
+
+            # 转换为TripPlan对象(使用预编译校验器)
+            return _TRIPPLAN_VALIDATOR.validate_python(data)
+
         except Exception as e:
             print(f"⚠️  解析响应失败: {str(e)}")
+            return None
+
+    def _parse_response(self, response: str, request: TripRequest) -> TripPlan:
+        """
+        解析Agent响应,失败时回退到备用计划
+
+        Args:
+            response: Agent响应文本
+            request: 原始请求
+
+        Returns:
+            旅行计划
+        """
+        trip_plan = self._try_parse_response(response)
+        if trip_plan is None:
             print(f"   将使用备用方案生成计划")
             return self._create_fallback_plan(request)
+        return trip_plan
     
     def _create_fallback_plan(self, request: TripRequest) -> TripPlan:
         """创建备用计划(当Agent失败时)"""
         from datetime import datetime, timedelta
-        
-        # 解析日期
-        start_date = datetime.strptime(request.start_date, "%Y-%m-%d")
-        
-        # 创建每日行程
+
+        # 解析日期(fromisoformat比strptime快,无需解析格式串)
+        current_date = datetime.fromisoformat(request.start_date)
+        one_day = timedelta(days=1)
+
+        # 创建每日行程(单步累加日期,避免每天重算偏移)
         days = []
         for i in range(request.travel_days):
-            current_date = start_date + timedelta(days=i)
-            
             day_plan = DayPlan(
                 date=current_date.strftime("%Y-%m-%d"),
                 day_index=i,
@@ -270,12 +497,12 @@ class MultiAgentTripPlanner:
                     for j in range(2)
                 ],
                 meals=[
-                    Meal(type="breakfast", name=f"第{i+1}天早餐", description="当地特色早餐"),
-                    Meal(type="lunch", name=f"第{i+1}天午餐", description="午餐推荐"),
-                    Meal(type="dinner", name=f"第{i+1}天晚餐", description="晚餐推荐")
+                    Meal(type=meal_type, name=f"第{i+1}天{meal_name}", description=meal_desc)
+                    for meal_type, meal_name, meal_desc in _FALLBACK_MEALS
                 ]
             )
             days.append(day_plan)
+            current_date += one_day
         
         return TripPlan(
             city=request.city,
@@ -287,18 +514,125 @@ class MultiAgentTripPlanner:
         )
 
 
+class AgentPool:
+    """
+    多智能体规划器池
+
+    预热min_size个实例,并发高峰时按需扩容到max_size;
+    空闲超过idle_timeout秒的多余实例由后台任务回收。
+    MCP工具/LLM客户端仍是进程级单例,实例本身只持有各自的图
+    """
+
+    def __init__(self, min_size: int = 2, max_size: int = 10, idle_timeout: float = 300.0):
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._idle: List[Any] = []  # [(planner, 归还时间)]
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self._cleanup_task = None
+
+    async def start(self):
+        """预热最小数量的规划器实例并启动空闲回收任务"""
+        print(f"🔄 预热规划器池({self._min_size}个实例)...")
+        planners = await asyncio.gather(
+            *[self._create_planner() for _ in range(self._min_size)]
+        )
+        now = time.monotonic()
+        self._idle = [(planner, now) for planner in planners]
+        self._size = self._min_size
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        print(f"✅ 规划器池预热完成")
+
+    @staticmethod
+    async def _create_planner() -> "MultiAgentTripPlanner":
+        planner = MultiAgentTripPlanner()
+        await planner.init()
+        return planner
+
+    @asynccontextmanager
+    async def acquire(self):
+        """借出一个规划器实例,退出上下文时自动归还"""
+        planner = await self._checkout()
+        try:
+            yield planner
+        finally:
+            await self._release(planner)
+
+    async def _checkout(self) -> "MultiAgentTripPlanner":
+        async with self._cond:
+            while True:
+                if self._idle:
+                    planner, _ = self._idle.pop()
+                    return planner
+                if self._size < self._max_size:
+                    self._size += 1
+                    break
+                await self._cond.wait()
+
+        # 在锁外初始化新实例,不阻塞其他调用方
+        try:
+            return await self._create_planner()
+        except Exception:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    async def _release(self, planner: "MultiAgentTripPlanner"):
+        async with self._cond:
+            self._idle.append((planner, time.monotonic()))
+            self._cond.notify()
+
+    async def _cleanup_loop(self):
+        """定期回收空闲超时的多余实例,池子最少保留min_size个"""
+        while True:
+            await asyncio.sleep(self._idle_timeout / 2)
+            now = time.monotonic()
+            async with self._cond:
+                while (
+                    self._size > self._min_size
+                    and self._idle
+                    and now - self._idle[0][1] > self._idle_timeout
+                ):
+                    self._idle.pop(0)
+                    self._size -= 1
+
+
 # 全局多智能体系统实例
 _multi_agent_planner = None
+_planner_init_lock = asyncio.Lock()
+
+# 全局规划器池
+_agent_pool = None
+_pool_init_lock = asyncio.Lock()
+
+
+async def get_agent_pool() -> AgentPool:
+    """获取规划器池实例(单例模式,并发首次调用安全)"""
+    global _agent_pool
+
+    if _agent_pool is None:
+        async with _pool_init_lock:
+            if _agent_pool is None:
+                pool = AgentPool()
+                await pool.start()
+                _agent_pool = pool
+
+    return _agent_pool
 
 
 async def get_trip_planner_agent() -> MultiAgentTripPlanner:
-    """获取多智能体旅行规划系统实例(单例模式)"""
+    """获取多智能体旅行规划系统实例(单例模式,并发首次调用安全)"""
     global _multi_agent_planner
 
     if _multi_agent_planner is None:
-        _multi_agent_planner = MultiAgentTripPlanner()
-        await _multi_agent_planner.init()
-
+        async with _planner_init_lock:
+            # 双重检查: 等锁期间可能已有调用方完成初始化
+            if _multi_agent_planner is None:
+                planner = MultiAgentTripPlanner()
+                await planner.init()
+                _multi_agent_planner = planner
 
     return _multi_agent_planner
 
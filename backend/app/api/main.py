@@ -3,6 +3,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from ..config import get_settings, validate_config, print_config
+from ..services.llm_service import close_http_async_client
 from .routes import trip, poi, map as map_routes
 
 # 获取配置
@@ -62,6 +63,10 @@ async def shutdown_event():
     """应用关闭事件"""
     print("\n" + "="*60)
     print("👋 应用正在关闭...")
+
+    # 关闭共享HTTP连接池
+    await close_http_async_client()
+
     print("="*60 + "\n")
 
 
@@ -1,12 +1,15 @@
 """旅行规划API路由"""
 
+import json
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from ...models.schemas import (
     TripRequest,
     TripPlanResponse,
     ErrorResponse
 )
-from ...agents.trip_planner_agent import get_trip_planner_agent
+from ...agents.trip_planner_agent import get_agent_pool, get_trip_planner_agent
 
 router = APIRouter(prefix="/trip", tags=["旅行规划"])
 
@@ -35,13 +38,14 @@ async def plan_trip(request: TripRequest):
         print(f"   天数: {request.travel_days}")
         print(f"{'='*60}\n")
 
-        # 获取Agent实例
+        # 从规划器池借出实例
         print("🔄 获取多智能体系统实例...")
-        agent = await get_trip_planner_agent()
+        pool = await get_agent_pool()
 
         # 生成旅行计划
         print("🚀 开始生成旅行计划...")
-        trip_plan =  await agent.plan_trip(request)
+        async with pool.acquire() as agent:
+            trip_plan = await agent.plan_trip(request)
 
         print("✅ 旅行计划生成成功,准备返回响应\n")
 
@@ -61,6 +65,38 @@ async def plan_trip(request: TripRequest):
         )
 
 
+@router.post(
+    "/plan/stream",
+    summary="流式生成旅行计划",
+    description="以SSE流式返回旅行计划token,首字节延迟降到单token级别"
+)
+async def plan_trip_stream(request: TripRequest):
+    """
+    流式生成旅行计划
+
+    Args:
+        request: 旅行请求参数
+
+    Returns:
+        SSE事件流,每个事件携带一段计划文本,结束时发送[DONE]
+    """
+    pool = await get_agent_pool()
+
+    async def event_stream():
+        try:
+            async with pool.acquire() as agent:
+                async for chunk in agent.plan_trip_stream(request):
+                    payload = json.dumps({"delta": chunk}, ensure_ascii=False)
+                    yield f"data: {payload}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            print(f"❌ 流式生成旅行计划失败: {str(e)}")
+            payload = json.dumps({"error": str(e)}, ensure_ascii=False)
+            yield f"data: {payload}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get(
     "/health",
     summary="健康检查",
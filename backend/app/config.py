@@ -34,6 +34,11 @@ class Settings(BaseSettings):
     # 高德地图API配置
     amap_api_key: str = ""
 
+    # 高德地图MCP服务地址(可选)
+    # 配置后走长驻HTTP服务(如 http://127.0.0.1:8719/mcp),
+    # 多个worker共享一个MCP进程;不配置则回退到stdio子进程
+    amap_mcp_url: str = ""
+
     # Unsplash API配置
     unsplash_access_key: str = ""
     unsplash_secret_key: str = ""
@@ -0,0 +1,50 @@
+"""日志工具模块"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+
+from .config import get_settings
+
+# 全局队列监听器(只启动一次)
+_listener = None
+_log_queue = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    获取非阻塞logger(单例监听线程)
+
+    日志记录先进入内存队列,由后台线程串行写出,
+    热路径上不再因stdout flush阻塞事件循环
+
+    Args:
+        name: logger名称,通常传__name__
+
+    Returns:
+        logging.Logger实例
+    """
+    global _listener, _log_queue
+
+    if _listener is None:
+        _log_queue = queue.SimpleQueue()
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s %(message)s"
+        ))
+
+        _listener = logging.handlers.QueueListener(
+            _log_queue, handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        # app包下的所有logger都经由队列输出
+        app_logger = logging.getLogger("app")
+        app_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+        app_logger.setLevel(get_settings().log_level.upper())
+        app_logger.propagate = False
+
+    return logging.getLogger(name)
@@ -5,54 +5,75 @@ from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_core.tools import BaseTool
 from ..config import get_settings
 from ..models.schemas import Location, POIInfo, WeatherInfo
+from ..logging_utils import get_logger
+from ..utils import extract_json_object
+from cachetools import TTLCache
 import asyncio
+import json
+import logging
+import orjson
+
+logger = get_logger(__name__)
 
 # 全局MCP工具实例
 _amap_mcp_tool = None
+_amap_mcp_tool_lock = asyncio.Lock()
 
 
 async def get_amap_mcp_tool() -> list[BaseTool]:
     """
     使用 LangChain MCPClient 获取高德地图 MCP 工具列表
-    异步获取高德地图MCP工具实例(单例模式)
-    
+    异步获取高德地图MCP工具实例(单例模式,并发首次调用安全)
+
     Returns:
         BaseTool列表
     """
     global _amap_mcp_tool
-    
+
     if _amap_mcp_tool is not None:
         return _amap_mcp_tool
-    else:
+
+    async with _amap_mcp_tool_lock:
+        # 双重检查: 等锁期间可能已有调用方完成初始化
+        if _amap_mcp_tool is not None:
+            return _amap_mcp_tool
+
         settings = get_settings()
-        
+
         if not settings.amap_api_key:
             raise ValueError("高德地图API Key未配置,请在.env文件中设置AMAP_API_KEY")
-        
+
         # 创建MCP工具
-        _amap_mcp_client = MultiServerMCPClient(
-            {
-                "amap":{
-                    "command": "uvx",
-                    "args": ["amap-mcp-server"],
-                    "env": {"AMAP_MAPS_API_KEY": settings.amap_api_key},
-                    "transport": "stdio",
-                }
+        # 优先连接长驻HTTP服务,避免每个进程各自fork一个stdio子进程
+        if settings.amap_mcp_url:
+            amap_server = {
+                "url": settings.amap_mcp_url,
+                "transport": "streamable_http",
             }
-        )
-        
-        _amap_mcp_tool = await _amap_mcp_client.get_tools()
+        else:
+            amap_server = {
+                "command": "uvx",
+                "args": ["amap-mcp-server"],
+                "env": {"AMAP_MAPS_API_KEY": settings.amap_api_key},
+                "transport": "stdio",
+            }
+        _amap_mcp_client = MultiServerMCPClient({"amap": amap_server})
+
+        tools = await _amap_mcp_client.get_tools()
         print(f"✅ 高德地图MCP工具初始化成功")
-        print(f"   工具数量: {len(_amap_mcp_tool)}")
-        
+        print(f"   工具数量: {len(tools)}")
+
         # 打印可用工具列表
-        if len(_amap_mcp_tool):
+        if len(tools):
             print("   可用工具:")
-            for tool in _amap_mcp_tool[:5]:  # 只打印前5个
+            for tool in tools[:5]:  # 只打印前5个
                 print(f"     - {tool.name}")
-            if len(_amap_mcp_tool) > 5:
-                print(f"     ... 还有 {len(_amap_mcp_tool) - 5} 个工具")
-    
+            if len(tools) > 5:
+                print(f"     ... 还有 {len(tools) - 5} 个工具")
+
+        # 获取成功后才发布全局实例,失败时下次调用重试
+        _amap_mcp_tool = tools
+
     return _amap_mcp_tool
 
 
@@ -62,12 +83,63 @@ class AmapService:
     def __init__(self):
         """初始化服务"""
         self.mcp_tool = None
+        # 工具名 -> 工具实例索引,O(1)查找
+        self._tools_by_name: Dict[str, BaseTool] = {}
+        # MCP结果TTL缓存: POI搜索24小时,天气30分钟
+        self._poi_cache = TTLCache(maxsize=256, ttl=24 * 3600)
+        self._weather_cache = TTLCache(maxsize=128, ttl=30 * 60)
+        # 在途请求表: 相同key的并发请求共享同一个future
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _cache_key(arguments: Dict[str, Any]) -> str:
+        """将工具调用参数规范化为缓存键"""
+        return json.dumps(arguments, sort_keys=True, ensure_ascii=False)
+
+    async def _single_flight(self, key: str, supplier):
+        """
+        单飞合并: 相同key的在途请求只真正发出一次
+
+        并发调用方共享同一个future的结果,结束后从在途表移除
+
+        Args:
+            key: 请求的规范化键(方法名+参数)
+            supplier: 发起实际调用的无参协程工厂
+
+        Returns:
+            调用结果
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            return await future
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await supplier()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # 标记异常已取回,避免无等待方时的警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
     
     async def init(self):
         """异步初始化MCP工具"""
         self.mcp_tool = await get_amap_mcp_tool()
+        self._tools_by_name = {tool.name: tool for tool in self.mcp_tool}
+
+    def _get_tool(self, tool_name: str) -> BaseTool:
+        """按名称获取MCP工具"""
+        try:
+            return self._tools_by_name[tool_name]
+        except KeyError:
+            raise ValueError(f"MCP工具不存在: {tool_name}")
+
 
-    
     async def search_poi(self, keywords: str, city: str, citylimit: bool = True) -> List[POIInfo]:
         """
         搜索POI
@@ -82,26 +154,33 @@ class AmapService:
         """
         try:
             # 调用MCP工具
-            amap = AmapService()
-            await amap.init()
-            search_tool = next(tool for tool in self.mcp_tool if tool.name == "maps_text_search")
-            
-            result = await search_tool.ainvoke({
+            search_tool = self._get_tool("maps_text_search")
+
+            arguments = {
                 "keywords": keywords,
-                    "city": city,
-                    "citylimit": str(citylimit).lower()
-            })
-            
+                "city": city,
+                "citylimit": str(citylimit).lower()
+            }
+            cache_key = self._cache_key(arguments)
+            result = self._poi_cache.get(cache_key)
+            if result is None:
+                result = await self._single_flight(
+                    f"search_poi:{cache_key}",
+                    lambda: search_tool.ainvoke(arguments),
+                )
+                self._poi_cache[cache_key] = result
+
             # 解析结果
             # 注意: MCP工具返回的是字符串,需要解析
             # 这里简化处理,实际应该解析JSON
-            print(f"POI搜索结果: {result[:200]}...")  # 打印前200字符
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("POI搜索结果: %s", result[:200])
             
             # TODO: 解析实际的POI数据
             return []
             
         except Exception as e:
-            print(f"❌ POI搜索失败: {str(e)}")
+            logger.error("POI搜索失败: %s", e)
             return []
     
     async def get_weather(self, city: str) -> List[WeatherInfo]:
@@ -116,21 +195,26 @@ class AmapService:
         """
         try:
             # 调用MCP工具
-            amap = AmapService()
-            await amap.init()
-            weather_tool = next(tool for tool in self.mcp_tool if tool.name == "maps_weather")
+            weather_tool = self._get_tool("maps_weather")
 
-            result = await weather_tool.ainvoke({
-                "city": city
-            })
-            
-            print(f"天气查询结果: {result[:200]}...")
+            arguments = {"city": city}
+            cache_key = self._cache_key(arguments)
+            result = self._weather_cache.get(cache_key)
+            if result is None:
+                result = await self._single_flight(
+                    f"get_weather:{cache_key}",
+                    lambda: weather_tool.ainvoke(arguments),
+                )
+                self._weather_cache[cache_key] = result
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("天气查询结果: %s", result[:200])
             
             # TODO: 解析实际的天气数据
             return []
             
         except Exception as e:
-            print(f"❌ 天气查询失败: {str(e)}")
+            logger.error("天气查询失败: %s", e)
             return []
     
     async def plan_route(
@@ -155,8 +239,6 @@ class AmapService:
             路线信息
         """
         try:
-            amap = AmapService()
-            await amap.init()
             # 根据路线类型选择工具
             tool_map = {
                 "walking": "maps_direction_walking_by_address",
@@ -186,16 +268,17 @@ class AmapService:
                     arguments["destination_city"] = destination_city
             
             # 调用MCP工具
-            route_tool = next(tool for tool in self.mcp_tool if tool.name == tool_name)
+            route_tool = self._get_tool(tool_name)
             result = await route_tool.ainvoke(arguments)
             
-            print(f"路线规划结果: {result[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("路线规划结果: %s", result[:200])
             
             # TODO: 解析实际的路线数据
             return {}
             
         except Exception as e:
-            print(f"❌ 路线规划失败: {str(e)}")
+            logger.error("路线规划失败: %s", e)
             return {}
     
     async def geocode(self, address: str, city: Optional[str] = None) -> Optional[Location]:
@@ -210,23 +293,24 @@ class AmapService:
             经纬度坐标
         """
         try:
-            amap = AmapService()
-            await amap.init()
-
             arguments = {"address": address}
             if city:
                 arguments["city"] = city
 
-            geocode_tool = next(tool for tool in self.mcp_tool if tool.name == "maps_geo")
-            result = await geocode_tool.ainvoke(arguments)
+            geocode_tool = self._get_tool("maps_geo")
+            result = await self._single_flight(
+                f"geocode:{self._cache_key(arguments)}",
+                lambda: geocode_tool.ainvoke(arguments),
+            )
 
-            print(f"地理编码结果: {result[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("地理编码结果: %s", result[:200])
 
             # TODO: 解析实际的坐标数据
             return None
 
         except Exception as e:
-            print(f"❌ 地理编码失败: {str(e)}")
+            logger.error("地理编码失败: %s", e)
             return None
 
     async def get_poi_detail(self, poi_id: str) -> Dict[str, Any]:
@@ -240,43 +324,43 @@ class AmapService:
             POI详情信息
         """
         try:
-            amap = AmapService()
-            await amap.init()
-            detail_tool = next(tool for tool in self.mcp_tool if tool.name == "maps_search_detail")
-            result = await detail_tool.ainvoke({
-                "id": poi_id
-            })
-
-            print(f"POI详情结果: {result[:200]}...")
+            detail_tool = self._get_tool("maps_search_detail")
+            result = await self._single_flight(
+                f"get_poi_detail:{poi_id}",
+                lambda: detail_tool.ainvoke({"id": poi_id}),
+            )
 
-            # 解析结果并提取图片
-            import json
-            import re
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("POI详情结果: %s", result[:200])
 
-            # 尝试从结果中提取JSON
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                return data
+            # 尝试从结果中提取JSON(单次扫描,避免正则回溯)
+            json_str = extract_json_object(result)
+            if json_str is not None:
+                return orjson.loads(json_str)
 
             return {"raw": result}
 
         except Exception as e:
-            print(f"❌ 获取POI详情失败: {str(e)}")
+            logger.error("获取POI详情失败: %s", e)
             return {}
 
 
 # 创建全局服务实例
 _amap_service = None
+_amap_service_lock = asyncio.Lock()
 
 
 async def get_amap_service() -> AmapService:
-    """获取高德地图服务实例(单例模式)"""
+    """获取高德地图服务实例(单例模式,并发首次调用安全)"""
     global _amap_service
-    
+
     if _amap_service is None:
-        _amap_service = AmapService()
-        await _amap_service.init()
-    
+        async with _amap_service_lock:
+            if _amap_service is None:
+                service = AmapService()
+                await service.init()
+                # init成功后才发布,避免并发调用方拿到半初始化实例
+                _amap_service = service
+
     return _amap_service
 
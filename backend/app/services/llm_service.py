@@ -2,37 +2,86 @@
 
 from ..config import get_settings
 from langchain_openai import ChatOpenAI
+import httpx
 import os
+import threading
 
 # 全局LLM实例
+# get_llm可能经asyncio.to_thread在多个线程并发首调,需线程锁保护
 _llm_instance = None
+_llm_lock = threading.Lock()
+
+# 全局共享的异步HTTP客户端(连接池复用,避免每次请求重建TCP+TLS)
+_http_async_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_async_client() -> httpx.AsyncClient:
+    """
+    获取共享的异步HTTP客户端(单例模式,线程安全)
+
+    所有LLM请求复用同一个连接池,长连接保活75秒
+
+    Returns:
+        httpx.AsyncClient实例
+    """
+    global _http_async_client
+
+    if _http_async_client is None:
+        with _http_client_lock:
+            if _http_async_client is None:
+                _http_async_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=100,
+                        max_keepalive_connections=32,
+                        keepalive_expiry=75,
+                    ),
+                    timeout=60,
+                )
+
+    return _http_async_client
+
+
+async def close_http_async_client():
+    """关闭共享HTTP客户端(应用关闭时调用)"""
+    global _http_async_client
+
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
 
 
 def get_llm():
     """
-    获取LLM实例(单例模式)
-    
+    获取LLM实例(单例模式,线程安全)
+
     Returns:
         HelloAgentsLLM实例
     """
     global _llm_instance
-    
+
     if _llm_instance is None:
-        settings = get_settings()
-        # HelloAgentsLLM会自动从环境变量读取配置
-        # 包括OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL等
-        _llm_instance = ChatOpenAI(
-            model=settings.openai_model,
-            api_key=settings.openai_api_key,
-            base_url= settings.openai_base_url,
-            timeout=60,
-            streaming=True,
-        )
-        
-        print(f"✅ LLM服务初始化成功")
-        # print(f"   提供商: {_llm_instance.provider}")
-        print(f"   模型: {os.getenv('LLM_MODEL_ID')}")
-    
+        with _llm_lock:
+            if _llm_instance is None:
+                settings = get_settings()
+                # 注意: 不在这里挂全局LLM缓存 —— 缓存命中时BaseChatModel
+                # 直接返回结果、不触发token回调,会让流式规划produce空流;
+                # 重复请求的复用由规划层的TTL缓存负责
+                # HelloAgentsLLM会自动从环境变量读取配置
+                # 包括OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL等
+                _llm_instance = ChatOpenAI(
+                    model=settings.openai_model,
+                    api_key=settings.openai_api_key,
+                    base_url= settings.openai_base_url,
+                    timeout=60,
+                    streaming=True,
+                    http_async_client=get_http_async_client(),
+                )
+
+                print(f"✅ LLM服务初始化成功")
+                # print(f"   提供商: {_llm_instance.provider}")
+                print(f"   模型: {os.getenv('LLM_MODEL_ID')}")
+
     return _llm_instance
 
 
@@ -0,0 +1,52 @@
+"""通用工具函数"""
+
+from typing import Optional
+
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    单次正向扫描定位文本中最外层的JSON对象
+
+    通过统计花括号深度找到第一个"{"到与之配对的"}"的范围,
+    替代正则`\\{.*\\}`的回溯扫描和重复的find/rfind全量扫描
+
+    Args:
+        text: 含有JSON的文本
+
+    Returns:
+        JSON子串,未找到完整对象时返回None
+    """
+    start = -1
+    depth = 0
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(text):
+        # 对象外的文字直接跳过: 散文里的引号不参与字符串状态,
+        # 否则一个未配对的"会让整个扫描失效
+        if depth == 0:
+            if ch == "{":
+                start = i
+                depth = 1
+            continue
+
+        if in_string:
+            # 字符串内部只需要处理转义和结束引号
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return None
@@ -7,13 +7,14 @@ from app.services.unsplash_service import get_unsplash_service
 # 单例客户端
 _amap_mcp_client = None
 _tools_cache = None
+_tools_by_name = None
 
 
 async def get_amap_mcp_tools():
     """
     使用 LangChain MCPClient 获取高德地图 MCP 工具列表
     """
-    global _amap_mcp_client, _tools_cache
+    global _amap_mcp_client, _tools_cache, _tools_by_name
     if _tools_cache is not None:
         return _tools_cache
 
@@ -22,19 +23,25 @@ async def get_amap_mcp_tools():
         raise ValueError("高德地图API Key未配置,请在.env文件中设置AMAP_API_KEY")
 
     if _amap_mcp_client is None:
-        # 创建 MCP 客户端
-        _amap_mcp_client = MultiServerMCPClient({
-            "amap": {
+        # 创建 MCP 客户端(配置了AMAP_MCP_URL时走长驻HTTP服务)
+        if settings.amap_mcp_url:
+            amap_server = {
+                "url": settings.amap_mcp_url,
+                "transport": "streamable_http",
+            }
+        else:
+            amap_server = {
                 "command": "uvx",
                 "args": ["amap-mcp-server"],
                 "env": {"AMAP_MAPS_API_KEY": settings.amap_api_key},
                 "transport": "stdio",
             }
-        })
+        _amap_mcp_client = MultiServerMCPClient({"amap": amap_server})
     
-    # 获取工具列表
+    # 获取工具列表,并按名称建立索引
     _tools_cache = await _amap_mcp_client.get_tools()
-    
+    _tools_by_name = {tool.name: tool for tool in _tools_cache}
+
     # print(f"✅ 高德地图MCP工具初始化成功")
     # print(f"   工具数量: {len(_tools_cache)}")
     # for tool_name in _tools_cache[:5]:
@@ -46,8 +53,8 @@ async def get_amap_mcp_tools():
     return _tools_cache
 
 async def test_mcp_search():
-    tools = await get_amap_mcp_tools()
-    search_tool = next(tool for tool in tools if tool.name == "maps_text_search")
+    await get_amap_mcp_tools()
+    search_tool = _tools_by_name["maps_text_search"]
 
     result = await search_tool.ainvoke({
         "keywords": "景点",
@@ -68,23 +75,21 @@ async def get_poi_detail(poi_id: str):
             POI详情信息
         """
         try:
-            tools = await get_amap_mcp_tools()
-            detail_tool = next(tool for tool in tools if tool.name == "maps_search_detail")
+            await get_amap_mcp_tools()
+            detail_tool = _tools_by_name["maps_search_detail"]
             result = await detail_tool.ainvoke({
                 "id": 213123
             })
 
             print(f"POI详情结果: {result[:200]}...")
 
-            # 解析结果并提取图片
-            import json
-            import re
+            # 尝试从结果中提取JSON(单次扫描,避免正则回溯)
+            import orjson
+            from app.utils import extract_json_object
 
-            # 尝试从结果中提取JSON
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                return data
+            json_str = extract_json_object(result)
+            if json_str is not None:
+                return orjson.loads(json_str)
 
             return {"raw": result}
 
@@ -103,12 +108,12 @@ async def geocode(self, address: str, city: str = None):
             经纬度坐标
         """
         try:
-            tools = await get_amap_mcp_tools()
+            await get_amap_mcp_tools()
             arguments = {"address": address}
             if city:
                 arguments["city"] = city
 
-            geocode_tool = next(tool for tool in tools if tool.name == "maps_geo")
+            geocode_tool = _tools_by_name["maps_geo"]
             result = await geocode_tool.ainvoke(arguments)
 
             print(f'''